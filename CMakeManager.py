@@ -9,9 +9,11 @@ import tarfile
 import zipfile
 import subprocess
 import shutil
+import shlex
 from io import BytesIO
 from pathlib import Path
 from os import PathLike
+from typing import IO
 
 
 class CMake:
@@ -21,14 +23,18 @@ class CMake:
         self.patch = patch
         self.path = path
 
-    def call(self, args: list[str | bytes | PathLike[str] | PathLike[bytes]]) -> None:
+    def call(self, args: list[str | bytes | PathLike[str] | PathLike[bytes]], stdout: IO | int = None,
+             stderr: IO | int = None, env: dict[str, str] = None) -> None:
         """
         Call CMake with the given list of arguments
         :param args: A list of arguments passed to the CMake binary
+        :param stdout: The file to which the standard output is redirected (Pass `None` to inherit it)
+        :param stderr: The file to which the standard error is redirected (Pass `None` to inherit it)
+        :param env: The environment variables of the CMake process (Pass `None` to inherit them)
         """
         args.insert(0, self.path)
-        print(f"CMake v{self.major}.{self.minor}.{self.patch} Args: {' '.join([str(arg) for arg in args])}", flush=True)
-        subprocess.run(args).check_returncode()
+        print(f"CMake v{self.major}.{self.minor}.{self.patch} Args: {shlex.join([str(arg) for arg in args])}", flush=True)
+        subprocess.run(args, stdout=stdout, stderr=stderr, env=env).check_returncode()
 
     @classmethod
     def default(cls) -> CMake:
@@ -247,6 +247,11 @@ class Chaos:
         menu.add_item("Clean the build folder and reset the toolchain", self.project_builder.clean_all)
         menu.add_item("Remove all Conan packages", self.project_builder.conan_remove_all)
         menu.add_item("Determine the minimum CMake version", self.project_builder.determine_minimum_cmake_version_interactive)
+        menu.add_item("Build the project incrementally (DEBUG)", self.project_builder.build_project_debug)
+        menu.add_item("Build the project incrementally (RELEASE)", self.project_builder.build_project_release)
+        menu.add_item("Refresh all Conan packages", self.project_builder.refresh_dependencies)
+        menu.add_item("Rebuild the project from scratch (DEBUG)", self.project_builder.rebuild_project_clean_debug)
+        menu.add_item("Rebuild the project from scratch (RELEASE)", self.project_builder.rebuild_project_clean_release)
         return menu
 
     #
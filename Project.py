@@ -13,6 +13,9 @@ class Project:
                  conan_flags: list[str] = None,
                  cmake_generate_flags: list[str] = None,
                  cmake_build_flags: list[str] = None,
+                 cmake_generator: str = None,
+                 use_compiler_cache: bool = True,
+                 unity_build: bool = False,
                  test_executables: list[str] = None,
                  coverage_source_directory_name: str = "Sources",
                  coverage_exclude_patterns: list[str] = None,
@@ -29,6 +32,12 @@ class Project:
         self.cmake_generate_flags: list[str] = cmake_generate_flags
         # A list of additional flags passed to CMake when building the project
         self.cmake_build_flags: list[str] = cmake_build_flags
+        # The CMake generator for the native build system (Pass `None` to use Ninja if available)
+        self.cmake_generator: str = cmake_generator
+        # Use `ccache` or `sccache` to launch the compiler if either of them is available
+        self.use_compiler_cache: bool = use_compiler_cache
+        # Compile source files in batches as unity builds (Coverage builds always compile each file on its own)
+        self.unity_build: bool = unity_build
         # Name of each executable that contains unit tests
         self.test_executables: list[str] = [f"{name}Tests"] if test_executables is None else test_executables
         # A path to the source directory in which all C/C++ files for coverage analysis can be found
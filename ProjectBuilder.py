@@ -3,13 +3,44 @@
 #
 from __future__ import annotations
 
+import functools
 import os
 from typing import Any
 from .CompilerToolchainManager import *
 from .CMakeManager import CMakeManager, CMake
 from .Project import Project
-import glob
 import platform
+import shlex
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Extensions of C/C++ source files that are considered when analyzing the code coverage
+kCoverageSourceFileExtensions = (".cpp", ".hpp", ".ipp", ".tpp", ".cxx", ".hxx", ".cc", ".hh")
+
+# The number of source files combined into a single translation unit in unity builds
+kUnityBuildBatchSize = 16
+
+# Matches each `set(<Name> <Value>)` command in a CMake Toolchain file
+kCMakeSetCommandRegex = re.compile(r"set\((\w+)\s+(.*?)\s*\)")
+
+# Names of the stamp files in the build folder that store the digests of the inputs of each configuration step
+kConanInstallStampFile = ".chaos_conan_install"
+kCMakeGenerateStampFile = ".chaos_cmake_generate"
+kConfigurationStampFile = ".chaos_configure"
+
+
+@functools.lru_cache
+def load_cmake_variables(toolchain: Path, mtime: int) -> dict[str, str]:
+    """
+    Load all CMake variables defined in the given CMake Toolchain file
+    :param toolchain: Path to a CMake Toolchain file
+    :param mtime: The modification time of the toolchain file, which invalidates the cached result once changed
+    :return: A map that associates the name of each variable with its value.
+    """
+    variables: dict[str, str] = {}
+    for name, value in kCMakeSetCommandRegex.findall(toolchain.read_text()):
+        # The first definition takes precedence
+        variables.setdefault(name, value)
+    return variables
 
 
 # A project builder that builds, tests, and cleans the project
@@ -22,6 +53,10 @@ class ProjectBuilder:
         """
         self.project = project
         self.cmake_manager = cmake_manager
+        # Exclude patterns converted to command line arguments, keyed by the option prepended to each pattern
+        self.coverage_exclude_args: dict[str, list[str]] = {}
+        # Source files analyzed for code coverage, collected once per coverage run
+        self.coverage_source_files: list[str] | None = None
 
     @cached_property
     def conan_cmake_integration_file(self) -> str:
@@ -31,58 +66,207 @@ class ProjectBuilder:
         """
         return "conan_toolchain.cmake" if is_conan_v2_installed() else "conan_paths.cmake"
 
+    @cached_property
+    def cmake_generator(self) -> str | None:
+        """
+        Get the CMake generator for the native build system
+        :return: The generator specified by the project, `Ninja` if it is available, `None` otherwise.
+        """
+        if self.project.cmake_generator is not None:
+            return self.project.cmake_generator
+        # Guard: Keep the Visual Studio generator for MSVC on Windows unless the project specifies one explicitly
+        #        Conan writes the Visual Studio platform and toolset into its toolchain file for MSVC by default.
+        if platform.system() == "Windows":
+            return None
+        return "Ninja" if shutil.which("ninja") is not None else None
+
+    @cached_property
+    def is_multi_config_generator(self) -> bool:
+        """
+        Check whether the CMake generator stores binaries in a separate folder for each build type
+        :return: `True` if the generator is a multi-config one, `False` otherwise.
+        """
+        if self.cmake_generator is None:
+            # CMake uses Visual Studio on Windows and Makefiles on other systems by default
+            return platform.system() == "Windows"
+        return self.cmake_generator.startswith(("Visual Studio", "Xcode")) or \
+            self.cmake_generator.endswith("Multi-Config")
+
+    def get_binary_directory(self, build_type: BuildType) -> Path:
+        """
+        Get the folder that stores the executables built for the given build type
+        :param build_type: The build type
+        :return: The path to the folder.
+        """
+        # Multi-Config Builds: "CMAKE_BINARY_DIR / <CONFIG>"
+        if self.is_multi_config_generator:
+            return self.project.build_directory / build_type.value
+        return self.project.build_directory
+
+    @cached_property
+    def compiler_launcher(self) -> str | None:
+        """
+        Get the compiler cache that is used to launch the compiler
+        :return: The name of the compiler cache if it is available and supported by the generator, `None` otherwise.
+        """
+        if not self.project.use_compiler_cache:
+            return None
+        # Compiler launchers are only supported by the Makefile and Ninja generators
+        if self.cmake_generator is None:
+            if platform.system() == "Windows":
+                return None
+        elif not self.cmake_generator.endswith(("Makefiles", "Ninja", "Ninja Multi-Config")):
+            return None
+        # `sccache` works better with MSVC than `ccache` does
+        candidates = ["sccache", "ccache"] if platform.system() == "Windows" else ["ccache", "sccache"]
+        return next((candidate for candidate in candidates if shutil.which(candidate) is not None), None)
+
+    @cached_property
+    def coverage_exclude_regex(self) -> re.Pattern | None:
+        """
+        Get the regular expression that matches source files excluded from coverage analysis
+        :return: The compiled regular expression, `None` if the project does not exclude any source files.
+        """
+        if not self.project.coverage_exclude_patterns:
+            return None
+        return re.compile("|".join([p.replace("*", ".*") for p in self.project.coverage_exclude_patterns]))
+
     #
     # MARK: - Small Steps
     #
 
-    def create_fresh_build_folder(self) -> None:
+    def create_fresh_build_folder(self, build_directory: Path = None) -> None:
         """
         [Action] [Step] Create a fresh build folder
+        :param build_directory: Path to the build folder (Pass `None` to use the build folder of the project)
         """
-        remove_folder_if_exists(self.project.build_directory)
-        os.mkdir(self.project.build_directory)
+        build_directory = build_directory or self.project.build_directory
+        remove_folder_in_background(build_directory)
+        os.mkdir(build_directory)
+
+    @property
+    def conan_lockfile(self) -> Path:
+        """
+        Get the path to the Conan lockfile that pins the resolved dependency graph
+        :return: The path to the lockfile.
+        """
+        return self.project.source_directory / "conan.lock"
+
+    @property
+    def conan_install_stamp(self) -> Path:
+        """
+        Get the path to the stamp file that stores the digest of the inputs of the last Conan installation
+        :return: The path to the stamp file.
+        """
+        return self.project.build_directory / kConanInstallStampFile
+
+    def conan_lock_create(self,
+                          build_profile: Path,
+                          host_profile: Path,
+                          conan_flags: list[str] = None,
+                          update: bool = False) -> None:
+        """
+        [Action] [Step] Resolve all required dependencies via Conan 2.x and store the graph in the lockfile
+        :param build_profile: Path to a Conan profile that is used to build all dependencies on the host machine
+        :param host_profile: Path to a Conan profile that is used to host all dependencies on the target machine
+        :param conan_flags: Additional flags passed to `conan`
+        :param update: Pass `True` to check remotes for newer versions of dependencies
+        """
+        args = ["conan", "lock", "create", self.project.source_directory,
+                "--lockfile-out", self.conan_lockfile,
+                "--profile:build", build_profile, "--profile:host", host_profile]
+        if update:
+            args.append("--update")
+        # Resolve the graph with the same options and settings as the installation that consumes the lockfile
+        # Append Conan flags specified by the project
+        if self.project.conan_flags is not None:
+            args.extend(self.project.conan_flags)
+        # Append Conan flags specified by the caller
+        if conan_flags is not None:
+            args.extend(conan_flags)
+        print("Resolving all required packages via Conan...", flush=True)
+        print(f"Conan Args: {shlex.join([str(arg) for arg in args])}", flush=True)
+        subprocess.run(args).check_returncode()
 
     def conan_install(self,
                       build_profile: Path,
                       host_profile: Path,
-                      conan_flags: list[str] = None) -> None:
+                      conan_flags: list[str] = None,
+                      use_lockfile: bool = True,
+                      refresh: bool = False,
+                      build_directory: Path = None) -> None:
         """
         [Action] [Step] Install all required dependencies via Conan 1.x or 2.x
         :param build_profile: Path to a Conan profile that is used to build all dependencies on the host machine
         :param host_profile: Path to a Conan profile that is used to host all dependencies on the target machine
         :param conan_flags: Additional flags passed to `conan`
-        """
+        :param use_lockfile: Pass `True` to resolve dependencies from the lockfile (Conan 2.x only)
+        :param refresh: Pass `True` to check remotes for newer versions of dependencies and recreate the lockfile
+        :param build_directory: Path to the build folder (Pass `None` to use the build folder of the project)
+        """
+        build_directory = build_directory or self.project.build_directory
+        # Lockfiles created by Conan 1.x embed the profile and cannot be combined with the profile flags
+        use_lockfile = use_lockfile and is_conan_v2_installed()
+        if use_lockfile and (refresh or not self.conan_lockfile.exists()):
+            self.conan_lock_create(build_profile, host_profile, conan_flags, refresh)
         # Start with the default flags
         args = []
         if is_conan_v2_installed():
             args.extend(["conan", "install", self.project.source_directory,
-                         "--output-folder", self.project.build_directory,
-                         "--update", "--build", "missing",
+                         "--output-folder", build_directory,
+                         "--build", "missing",
                          "--profile:build", build_profile, "--profile:host", host_profile])
+            # Let Conan generate a toolchain file that is compatible with the generator used to configure the project
+            if self.cmake_generator is not None:
+                args.extend(["-c", f"tools.cmake.cmaketoolchain:generator={self.cmake_generator}"])
+            if use_lockfile:
+                # The lockfile may be created with a profile that has a different build type
+                args.extend(["--lockfile", self.conan_lockfile, "--lockfile-partial"])
         else:
             if build_profile != host_profile:
                 raise ValueError("Cross compiling with two separated profiles is not supported by Conan 1.x.")
             args.extend(["conan", "install", self.project.source_directory,
-                         "--install-folder", self.project.build_directory,
-                         "--update", "--build", "missing",
+                         "--install-folder", build_directory,
+                         "--build", "missing",
                          "--profile", build_profile])
+        # Remotes are only checked for newer versions on request as dependencies are resolved from the local cache
+        if refresh:
+            args.append("--update")
         # Append Conan flags specified by the project
         if self.project.conan_flags is not None:
             args.extend(self.project.conan_flags)
         # Append Conan flags specified by the caller
         if conan_flags is not None:
             args.extend(conan_flags)
+        # Guard: Skip the installation if none of its inputs has changed since the last installation
+        stamp = build_directory / kConanInstallStampFile
+        digest = compute_digest([self.project.source_directory / "conanfile.py",
+                                 self.project.source_directory / "conanfile.txt",
+                                 self.conan_lockfile, build_profile, host_profile],
+                                [arg for arg in args if arg != "--update"])
+        chainload_file = build_directory / self.conan_cmake_integration_file
+        if not refresh and chainload_file.exists() and read_stamp(stamp) == digest:
+            print("All required packages are up to date.", flush=True)
+            return
+        # Build missing packages using all available cores unless users specify otherwise
+        # Conan 2.x uses all cores unless `tools.build:jobs` is set in a profile or `global.conf`,
+        # Conan 1.x respects `CONAN_CPU_COUNT` while packages built with CMake respect `CMAKE_BUILD_PARALLEL_LEVEL`
+        env = os.environ.copy()
+        env.setdefault("CONAN_CPU_COUNT", str(os.cpu_count()))
+        env.setdefault("CMAKE_BUILD_PARALLEL_LEVEL", str(os.cpu_count()))
         # Install all required packages
         print("Installing all required packages via Conan...", flush=True)
-        print(f"Conan Args: {' '.join([str(arg) for arg in args])}", flush=True)
-        subprocess.run(args).check_returncode()
+        print(f"Conan Args: {shlex.join([str(arg) for arg in args])}", flush=True)
+        subprocess.run(args, env=env).check_returncode()
+        write_stamp(stamp, digest)
 
     def cmake_generate(self,
                        cmake: CMake,
                        build_type: BuildType,
                        toolchain_file: Path,
                        chainload_toolchain_file: Path,
-                       cmake_generate_flags: list[str] = None) -> None:
+                       cmake_generate_flags: list[str] = None,
+                       build_directory: Path = None) -> bool:
         """
         [Action] [Step] Use CMake to generate files for the native build system
         :param cmake: The CMake binary that will be used to generate files for the native build system
@@ -90,51 +274,83 @@ class ProjectBuilder:
         :param toolchain_file: Path to the primary CMake toolchain file
         :param chainload_toolchain_file: Path to the secondary CMake toolchain file
         :param cmake_generate_flags: Additional flags passed to `cmake`
+        :param build_directory: Path to the build folder (Pass `None` to use the build folder of the project)
+        :return: `True` if the build folder was configured differently and its CMake cache has been discarded.
         """
+        build_directory = build_directory or self.project.build_directory
         print(f"Generating files for the native build system using CMake v{cmake.major}.{cmake.minor}.{cmake.patch}...")
         print(f"\tSource Directory: {self.project.source_directory}")
-        print(f"\tBuild Directory: {self.project.build_directory}")
+        print(f"\tBuild Directory: {build_directory}")
         print(f"\tBuild Type: {build_type.value}")
         print(f"\tCMake Toolchain: {toolchain_file}")
         print(f"\tChainload Toolchain: {chainload_toolchain_file}")
+        print(f"\tGenerator: {self.cmake_generator or 'Default'}")
+        print(f"\tCompiler Launcher: {self.compiler_launcher or 'None'}")
         # Start with the default flags
         args = ["-S", self.project.source_directory,
-                "-B", self.project.build_directory,
+                "-B", build_directory,
                 f"-DCMAKE_BUILD_TYPE={build_type.value}",
                 f"-DCMAKE_TOOLCHAIN_FILE={toolchain_file}",
                 f"-DCHAOS_CHAINLOAD_TOOLCHAIN_FILE={chainload_toolchain_file}"]
+        # Use the preferred generator if available
+        if self.cmake_generator is not None:
+            args.extend(["-G", self.cmake_generator])
+        # Use the compiler cache if available
+        if self.compiler_launcher is not None:
+            args.extend([f"-DCMAKE_C_COMPILER_LAUNCHER={self.compiler_launcher}",
+                         f"-DCMAKE_CXX_COMPILER_LAUNCHER={self.compiler_launcher}"])
         # Check if users specify to use the bundled libc++ library on macOS
         if int(os.getenv("USE_BUNDLED_LIBCPP", 0)) == 1:
             args.append("-DCHAOS_USE_BUNDLED_LIBCPP=ON")
+        # Compile source files in batches if the project opts in to unity builds
+        if self.project.unity_build:
+            args.extend(["-DCMAKE_UNITY_BUILD=ON", f"-DCMAKE_UNITY_BUILD_BATCH_SIZE={kUnityBuildBatchSize}"])
         # Append CMake flags specified by the project
         if self.project.cmake_generate_flags is not None:
             args.extend(self.project.cmake_generate_flags)
         # Append CMake flags specified by the caller
         if cmake_generate_flags is not None:
             args.extend(cmake_generate_flags)
+        # Guard: Values stored in the CMake cache take precedence over the new toolchain file and are kept unless
+        #        they are overridden explicitly, so discard the cache if the project is configured differently.
+        stamp = build_directory / kCMakeGenerateStampFile
+        digest = compute_digest([toolchain_file], [Path(toolchain_file).resolve(), cmake.path] + args)
+        cache = build_directory / "CMakeCache.txt"
+        discarded = cache.exists() and read_stamp(stamp) != digest
+        if discarded:
+            print("Discarding the CMake cache as the project was configured differently.")
+            remove_file_if_exist(cache)
+            remove_folder_if_exists(build_directory / "CMakeFiles")
         # Generate files for the native build system
         cmake.call(args)
+        write_stamp(stamp, digest)
+        return discarded
 
     def cmake_build(self,
                     cmake: CMake,
                     build_type: BuildType,
-                    parallel_level: int = os.cpu_count(),
+                    parallel_level: int | None = os.cpu_count(),
                     cmake_build_flags: list[str] = None,
-                    native_build_flags: list[str] = None) -> None:
+                    native_build_flags: list[str] = None,
+                    clean_first: bool = False) -> None:
         """
         [Action] [Step] Use CMake to invoke the native build system to build the project
         :param cmake: The CMake binary that will be used to invoke the native build system to build the project
         :param build_type: The build type
-        :param parallel_level: The number of threads to build the project
+        :param parallel_level: The number of threads to build the project, `None` to use the native default
         :param cmake_build_flags: Additional flags passed to `cmake`
         :param native_build_flags: Additional flags passed to the native build system
+        :param clean_first: Pass `True` to build the `clean` target first
         """
         print(f"Building the project using CMake v{cmake.major}.{cmake.minor}.{cmake.patch}...")
         # Start with the default flags
         args = ["--build", self.project.build_directory,
-                "--config", build_type.value,
-                "--clean-first",
-                "--parallel", str(parallel_level)]
+                "--config", build_type.value]
+        if parallel_level is not None:
+            args.extend(["--parallel", str(parallel_level)])
+        # Clean the build folder first if requested by the caller
+        if clean_first:
+            args.append("--clean-first")
         # Append CMake flags specified by the project
         if self.project.cmake_build_flags is not None:
             args.extend(self.project.cmake_build_flags)
@@ -145,79 +361,203 @@ class ProjectBuilder:
         if native_build_flags is not None:
             args.append("--")
             args.extend(native_build_flags)
+        # Let ccache share cached objects between build folders and ignore volatile macros unless configured otherwise
+        environment = None
+        if self.compiler_launcher == "ccache":
+            environment = os.environ.copy()
+            environment.setdefault("CCACHE_BASEDIR", os.getcwd())
+            environment.setdefault("CCACHE_SLOPPINESS", "pch_defines,time_macros")
         # Build the project
-        cmake.call(args)
+        cmake.call(args, env=environment)
 
-    def cmake_install(self, cmake: CMake, prefix: Path = None) -> None:
+    def cmake_install(self, cmake: CMake, prefix: Path = None, verbose: bool = False) -> None:
         """
         [Action] [Step] Use CMake to install the project artifacts
         :param cmake: The CMake binary that will be used to install all artifacts
         :param prefix: The installation prefix
+        :param verbose: Pass `True` to print the installation log to the console
         """
         print(f"Installing project artifacts using CMake v{cmake.major}.{cmake.minor}.{cmake.patch}...")
         args = ["--install", self.project.build_directory]
         if prefix is not None:
             args.extend(["--prefix", prefix])
-        cmake.call(args)
+        if verbose:
+            cmake.call(args)
+            return
+        # Writing one line per installed file to the console can take longer than installing the files
+        log = self.project.build_directory / "install.log"
+        try:
+            with open(log, "w") as file:
+                cmake.call(args, stdout=file, stderr=subprocess.STDOUT)
+            print(f"Installation log has been written to {log}.")
+        except subprocess.CalledProcessError:
+            print(log.read_text(), flush=True)
+            raise
 
     #
     # MARK: - Rebuild Project
     #
 
+    def get_conan_profiles(self, build_type: BuildType) -> tuple[Path, Path]:
+        """
+        [Helper] Get the Conan profiles selected for the given build type
+        :param build_type: The build type
+        :return: A pair of paths to the build profile and the host profile.
+        """
+        if build_type == BuildType.kDebug:
+            return Path(kCurrentConanBuildProfileDebug), Path(kCurrentConanHostProfileDebug)
+        else:
+            return Path(kCurrentConanBuildProfileRelease), Path(kCurrentConanHostProfileRelease)
+
+    def get_configured_build_type(self) -> BuildType | None:
+        """
+        [Helper] Get the build type with which the build folder was configured
+        :return: The build type recorded in the CMake cache, `None` if the build folder has not been configured.
+        """
+        try:
+            cache = (self.project.build_directory / "CMakeCache.txt").read_text()
+        except FileNotFoundError:
+            return None
+        result = re.search(r"^CMAKE_BUILD_TYPE:\w+=(\w+)$", cache, re.MULTILINE)
+        return BuildType(result.group(1)) if result is not None else None
+
+    @property
+    def configuration_stamp(self) -> Path:
+        """
+        Get the path to the stamp file that stores the digest of the inputs of the last configuration
+        :return: The path to the stamp file.
+        """
+        return self.project.build_directory / kConfigurationStampFile
+
+    def compute_configuration_digest(self,
+                                     cmake: CMake,
+                                     build_type: BuildType,
+                                     conan_flags: list[str] = None,
+                                     cmake_generate_flags: list[str] = None) -> str:
+        """
+        [Helper] Compute the digest of all inputs that determine how the project is configured
+        :param cmake: The CMake binary that will be used to generate files for the native build system
+        :param build_type: The build type
+        :param conan_flags: Additional flags passed to `conan`
+        :param cmake_generate_flags: Additional flags passed to `cmake` when generates files for the native build system
+        :return: The digest as a hexadecimal string.
+        """
+        build_profile, host_profile = self.get_conan_profiles(build_type)
+        toolchain_file = self.project.source_directory / kCurrentToolchainFile
+        files = [self.project.source_directory / "conanfile.py",
+                 self.project.source_directory / "conanfile.txt",
+                 self.project.source_directory / "CMakeLists.txt",
+                 self.conan_lockfile, toolchain_file, build_profile, host_profile]
+        values = [build_type.value, cmake.path, toolchain_file.resolve(), self.cmake_generator, self.compiler_launcher,
+                  os.getenv("USE_BUNDLED_LIBCPP", 0), self.project.unity_build, self.project.conan_flags, conan_flags,
+                  self.project.cmake_generate_flags, cmake_generate_flags]
+        return compute_digest(files, values)
+
     def configure(self,
                   cmake: CMake,
                   build_type: BuildType,
                   conan_flags: list[str] = None,
-                  cmake_generate_flags: list[str] = None) -> None:
+                  cmake_generate_flags: list[str] = None,
+                  fresh: bool = False,
+                  build_directory: Path = None) -> bool:
         """
         [Action] [Helper] Configure the project
         :param cmake: The CMake binary that will be used to invoke the native build system to build the project
         :param build_type: The build type
         :param conan_flags: Additional flags passed to `conan`
         :param cmake_generate_flags: Additional flags passed to `cmake` when generates files for the native build system
+        :param fresh: Pass `True` to configure the project in a fresh build folder instead of reusing the existing one
+        :param build_directory: Path to the build folder (Pass `None` to use the build folder of the project)
+        :return: `True` if the existing build folder was configured differently and needs to be cleaned before building.
         """
+        build_directory = build_directory or self.project.build_directory
         # Compute required properties for Conan
-        if build_type == BuildType.kDebug:
-            build_profile = kCurrentConanBuildProfileDebug
-            host_profile = kCurrentConanHostProfileDebug
-        else:
-            build_profile = kCurrentConanBuildProfileRelease
-            host_profile = kCurrentConanHostProfileRelease
+        build_profile, host_profile = self.get_conan_profiles(build_type)
 
         # Compute required properties for CMake
         toolchain_file = self.project.source_directory / kCurrentToolchainFile
-        chainload_file = self.project.build_directory / self.conan_cmake_integration_file
+        chainload_file = build_directory / self.conan_cmake_integration_file
 
         # Configure the project
-        self.create_fresh_build_folder()
-        self.conan_install(build_profile, host_profile, conan_flags)
-        self.cmake_generate(cmake, build_type, toolchain_file, chainload_file, cmake_generate_flags)
+        if fresh:
+            self.create_fresh_build_folder(build_directory)
+        else:
+            os.makedirs(build_directory, exist_ok=True)
+            # The stamp only describes configurations made by `rebuild_project`, which writes it again afterwards
+            remove_file_if_exist(build_directory / kConfigurationStampFile)
+        self.conan_install(build_profile, host_profile, conan_flags, build_directory=build_directory)
+        return self.cmake_generate(cmake, build_type, toolchain_file, chainload_file, cmake_generate_flags,
+                                   build_directory)
+
+    def build(self,
+              cmake: CMake,
+              build_type: BuildType,
+              cmake_build_flags: list[str] = None,
+              clean_first: bool = False) -> None:
+        """
+        [Action] [Helper] Build the configured project
+        :param cmake: The CMake binary that will be used to invoke the native build system to build the project
+        :param build_type: The build type
+        :param cmake_build_flags: Additional flags passed to `cmake` when building the project
+        :param clean_first: Pass `True` to build the `clean` target first
+        """
+        # Calculate required properties for the native build system
+        native_build_flags = None
+        parallel_level = os.cpu_count()
+        # MSBuild builds up to `parallel_level` projects at the same time (`/m`) and each project compiles its
+        # source files with a few compiler processes (`/p:CL_MPCount`), so that independent targets are built
+        # in parallel without oversubscribing the cores
+        if platform.system() == "Windows" and (self.cmake_generator or "Visual Studio").startswith("Visual Studio"):
+            native_build_flags = ["/p:CL_MPCount=2"]
+        # Ninja schedules jobs across all cores by default
+        if self.cmake_generator is not None and self.cmake_generator.startswith("Ninja"):
+            parallel_level = None
+
+        # Build the project
+        self.cmake_build(cmake, build_type, parallel_level, cmake_build_flags, native_build_flags, clean_first)
 
     def rebuild_project(self,
                         build_type: BuildType,
                         conan_flags: list[str] = None,
                         cmake_generate_flags: list[str] = None,
-                        cmake_build_flags: list[str] = None) -> None:
+                        cmake_build_flags: list[str] = None,
+                        fresh: bool = False) -> None:
         """
         [Action] [Helper] Rebuild the project
         :param build_type: The build type
         :param conan_flags: Additional flags passed to `conan`
         :param cmake_generate_flags: Additional flags passed to `cmake` when generates files for the native build system
         :param cmake_build_flags: Additional flags passed to `cmake` when building the project
+        :param fresh: Pass `True` to rebuild the project in a fresh build folder instead of reusing the existing one
         """
         # Get the default CMake
         cmake = CMake.default()
 
-        # Calculate required properties for the native build system
-        native_build_flags = None
-        parallel_level = os.cpu_count()
-        if platform.system() == "Windows":
-            native_build_flags = [f"/p:CL_MPCount={parallel_level}"]
-            parallel_level = 1
+        # Guard: Skip the configuration if none of its inputs has changed since the project was last configured
+        #        The native build system still reruns CMake by itself if any CMake script has been modified.
+        stamp = self.configuration_stamp
+        digest = self.compute_configuration_digest(cmake, build_type, conan_flags, cmake_generate_flags)
+        if not fresh and (self.project.build_directory / "CMakeCache.txt").exists() and read_stamp(stamp) == digest:
+            print("The project is already configured and none of its configuration inputs has changed.")
+            self.build(cmake, build_type, cmake_build_flags)
+            return
 
         # Rebuild the project
-        self.configure(cmake, build_type, conan_flags, cmake_generate_flags)
-        self.cmake_build(cmake, build_type, parallel_level, cmake_build_flags, native_build_flags)
+        # Object files left by a different configuration must be cleaned, while a fresh build folder has nothing to clean
+        clean_first = self.configure(cmake, build_type, conan_flags, cmake_generate_flags, fresh)
+        # The lockfile may have been created by the configuration
+        write_stamp(stamp, self.compute_configuration_digest(cmake, build_type, conan_flags, cmake_generate_flags))
+        self.build(cmake, build_type, cmake_build_flags, clean_first)
+
+    def build_project(self, build_type: BuildType, cmake_build_flags: list[str] = None) -> None:
+        """
+        [Action] [Helper] Build the project incrementally
+        :param build_type: The build type
+        :param cmake_build_flags: Additional flags passed to `cmake` when building the project
+        """
+        # The project is reconfigured only if any configuration input, such as the build type, has changed
+        # A build folder configured differently (e.g., for coverage) is therefore configured again and cleaned first.
+        self.rebuild_project(build_type, cmake_build_flags=cmake_build_flags)
 
     # Action
     def rebuild_project_debug(self) -> None:
@@ -234,11 +574,50 @@ class ProjectBuilder:
         self.rebuild_project(BuildType.kRelease)
 
     # Action
-    def install_project(self, prefix: Path = None) -> None:
+    def rebuild_project_clean_debug(self) -> None:
+        """
+        [Action] Rebuild the project from scratch in a fresh build folder in DEBUG mode
+        """
+        self.rebuild_project(BuildType.kDebug, fresh=True)
+
+    # Action
+    def rebuild_project_clean_release(self) -> None:
+        """
+        [Action] Rebuild the project from scratch in a fresh build folder in RELEASE mode
+        """
+        self.rebuild_project(BuildType.kRelease, fresh=True)
+
+    # Action
+    def build_project_debug(self) -> None:
+        """
+        [Action] Build the project incrementally in DEBUG mode
+        """
+        self.build_project(BuildType.kDebug)
+
+    # Action
+    def build_project_release(self) -> None:
+        """
+        [Action] Build the project incrementally in RELEASE mode
+        """
+        self.build_project(BuildType.kRelease)
+
+    # Action
+    def install_project(self, prefix: Path = None, verbose: bool = False) -> None:
         """
         [Action] Install all project artifacts
+        :param prefix: The installation prefix
+        :param verbose: Pass `True` to print the installation log to the console
+        """
+        self.cmake_install(CMake.default(), prefix, verbose)
+
+    # Action
+    def refresh_dependencies(self) -> None:
         """
-        self.cmake_install(CMake.default(), prefix)
+        [Action] Check remotes for newer versions of all dependencies and install them in the build folder
+        """
+        build_type = self.get_configured_build_type() or BuildType.kDebug
+        os.makedirs(self.project.build_directory, exist_ok=True)
+        self.conan_install(*self.get_conan_profiles(build_type), refresh=True)
 
     # Action
     def conan_remove_all(self) -> None:
@@ -246,6 +625,9 @@ class ProjectBuilder:
         [Action] Remove all build artifacts from Conan's local cache
         """
         subprocess.run(["conan", "remove", "-c", "*"]).check_returncode()
+        # Packages used by the build folder are gone, so the next build must install them and configure the project again
+        remove_file_if_exist(self.conan_install_stamp)
+        remove_file_if_exist(self.configuration_stamp)
 
     #
     # MARK: - Clean Up
@@ -257,48 +639,86 @@ class ProjectBuilder:
         [Action] Clean and remove the build folder
         """
         remove_folder_if_exists(self.project.build_directory)
+        remove_trash_folders(self.project.build_directory)
 
     # Action
     def clean_all(self) -> None:
         remove_folder_if_exists(self.project.build_directory)
-        remove_file_if_exist(kCurrentToolchainFile)
-        remove_file_if_exist(kCurrentConanBuildProfileDebug)
-        remove_file_if_exist(kCurrentConanBuildProfileRelease)
-        remove_file_if_exist(kCurrentConanHostProfileDebug)
-        remove_file_if_exist(kCurrentConanHostProfileRelease)
+        remove_trash_folders(self.project.build_directory)
+        remove_files_in_folder(Path("."), {kCurrentToolchainFile,
+                                           kCurrentConanBuildProfileDebug,
+                                           kCurrentConanBuildProfileRelease,
+                                           kCurrentConanHostProfileDebug,
+                                           kCurrentConanHostProfileRelease})
 
     #
     # MARK: - Run Tests
     #
 
     # Action
-    def run_test(self, name: str, build_type: BuildType, cwd: Path = None, env: dict[str, Any] = None) -> None:
+    def run_test(self, name: str, build_type: BuildType, cwd: Path = None, env: dict[str, Any] = None,
+                 log: Path = None) -> None:
         """
         [Action] Run a single test
         :param name: The name of the test
         :param build_type: The build type
         :param cwd: The working directory under which to run the test
         :param env: The environment variables with which to run the test
+        :param log: The file to which the output of the test is redirected (Pass `None` to print it to the console)
         """
-        directory = self.project.build_directory
-        # Win32 Builds: "CMAKE_BINARY_DIR / <CONFIG>"
-        if platform.system() == "Windows":
-            directory /= build_type.value
+        directory = self.get_binary_directory(build_type)
         working_directory = directory if cwd is None else cwd
-        environment = os.environ if env is None else os.environ.copy() | env
-        print("========================================")
-        print(f"Running test '{name}'...")
-        print("========================================")
-        subprocess.run([directory / name], cwd=working_directory, env=environment).check_returncode()
+        # Let the test inherit the environment unless additional variables are specified
+        environment = None if env is None else {**os.environ, **env}
+        if log is None:
+            print("========================================")
+            print(f"Running test '{name}'...")
+            print("========================================", flush=True)
+            subprocess.run([directory / name], cwd=working_directory, env=environment).check_returncode()
+            return
+        with open(log, "w") as file:
+            subprocess.run([directory / name], cwd=working_directory, env=environment,
+                           stdout=file, stderr=subprocess.STDOUT).check_returncode()
 
     # Action
-    def run_all_tests(self, build_type: BuildType) -> None:
+    def run_all_tests(self, build_type: BuildType, parallel: bool = True) -> None:
         """
         [Action] Run all tests
         :param build_type: The build type
-        """
-        for test in self.project.test_executables:
-            self.run_test(test, build_type)
+        :param parallel: Pass `True` to run tests concurrently, `False` to run them one after another
+        :raise `CalledProcessError` if any of the tests failed, or the first error that prevented a test from running.
+        """
+        tests = self.project.test_executables
+        if not parallel or len(tests) < 2:
+            for test in tests:
+                self.run_test(test, build_type)
+            return
+        # The output of each test is written to its own log file so that it does not interleave with others
+        error = None
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            logs = {test: self.project.build_directory / f"{test}.log" for test in tests}
+            futures = {executor.submit(self.run_test, test, build_type, log=log): test for test, log in logs.items()}
+            for future in as_completed(futures):
+                test = futures[future]
+                try:
+                    future.result()
+                    status = "passed"
+                except subprocess.CalledProcessError as exception:
+                    status = f"failed with exit code {exception.returncode}"
+                    error = error or exception
+                except Exception as exception:
+                    # e.g., The test executable cannot be found or launched
+                    status = f"could not be run: {exception}"
+                    error = error or exception
+                print("========================================")
+                print(f"Test '{test}' {status}. Output:")
+                print("========================================")
+                # Guard: The log file may not have been created if the test could not be run
+                if logs[test].exists():
+                    print(logs[test].read_text(errors="replace"), flush=True)
+        # Guard: Report the first failed test after all tests have finished
+        if error is not None:
+            raise error
 
     def rebuild_and_run_all_tests(self, build_type: BuildType) -> None:
         """
@@ -333,19 +753,37 @@ class ProjectBuilder:
         :param min_minor: The minimum minor version of CMake from which to start the search
         :param to_directory: Path to the directory to store the extracted CMake binary
         """
+        # Only the latest patch release of each version is considered
+        urls = [urls[-1] for urls in self.cmake_manager.get_all_installer_urls(min_major, min_minor).values() if urls]
+        # If the project can be configured by a CMake release, it can be configured by all later releases as well,
+        # so binary search for the first successful release and download only the releases that are probed.
+        # The probes share a scratch build folder, so Conan packages are only installed once while the project's
+        # build folder is never configured with a CMake binary that may be deleted after the search.
         results = dict[CMake, bool]()
-        for cmake in self.cmake_manager.get_cmake_binaries(min_major, min_minor, to_directory, True):
-            try:
-                self.configure(cmake, BuildType.kRelease)
-                results[cmake] = True
-            except subprocess.CalledProcessError:
-                results[cmake] = False
+        minimum: CMake | None = None
+        lower, upper = 0, len(urls)
+        with tempfile.TemporaryDirectory(prefix="ChaosCMakeProbe.") as scratch_directory:
+            while lower < upper:
+                middle = (lower + upper) // 2
+                cmake = self.cmake_manager.get_cmake_binary(urls[middle], to_directory)
+                try:
+                    self.configure(cmake, BuildType.kRelease, build_directory=Path(scratch_directory))
+                    results[cmake] = True
+                    minimum = cmake
+                    upper = middle
+                except subprocess.CalledProcessError:
+                    results[cmake] = False
+                    lower = middle + 1
         print("\n\n")
         print("=====================")
         print("Summary of Execution:")
         print("=====================")
-        for cmake, outcome in results.items():
+        for cmake, outcome in sorted(results.items(), key=lambda pair: (pair[0].major, pair[0].minor, pair[0].patch)):
             print(f"[{'SUCCESS' if outcome else 'FAILURE'}] CMake v{cmake.major}.{cmake.minor}.{cmake.patch}")
+        if minimum is None:
+            print("None of the CMake releases can configure the project.")
+        else:
+            print(f"The minimum version of CMake needed to configure the project is v{minimum.major}.{minimum.minor}.{minimum.patch}.")
 
     def determine_minimum_cmake_version_interactive(self) -> None:
         """
@@ -374,12 +812,10 @@ class ProjectBuilder:
         :param option: The command line tool option prepended to each exclude pattern
         :return: A list of command line arguments
         """
-        args: list[str] = []
-        if self.project.coverage_exclude_patterns is not None:
-            for exclude_pattern in self.project.coverage_exclude_patterns:
-                args.append(option)
-                args.append(exclude_pattern)
-        return args
+        if option not in self.coverage_exclude_args:
+            self.coverage_exclude_args[option] = [arg for exclude_pattern in self.project.coverage_exclude_patterns
+                                                  for arg in (option, exclude_pattern)]
+        return self.coverage_exclude_args[option]
 
     def get_cmake_variable_value(self, toolchain: Path, variable: str) -> str:
         """
@@ -389,12 +825,11 @@ class ProjectBuilder:
         :return: The value of the CMake variable on success.
         :raise: ValueError if the CMake variable of the given name does not exist.
         """
-        with open(toolchain) as file:
-            for line in file:
-                result = re.search("set\\({}\\s*(.*?)\\s*\\)".format(variable), line)
-                if result is not None:
-                    return result.group(1)
+        path = Path(toolchain).resolve()
+        variables = load_cmake_variables(path, path.stat().st_mtime_ns)
+        if variable not in variables:
             raise ValueError("Cannot find the path to the toolchain installation directory.")
+        return variables[variable]
 
     def get_gcov_path(self, toolchain: Path) -> Path:
         """
@@ -425,12 +860,34 @@ class ProjectBuilder:
         Get all source files to be considered when analyzing the code coverage
         :return: All the source files that will be analyzed for code coverage.
         """
-        files = glob.glob(f"{str(self.project.coverage_source_directory.resolve())}/**/*.*pp", recursive=True)
-        if self.project.coverage_exclude_patterns is not None:
-            regex = re.compile("|".join([p.replace("*", ".*") for p in self.project.coverage_exclude_patterns]))
-            return [file for file in files if not regex.search(file)]
-        else:
-            return files
+        if self.coverage_source_files is not None:
+            return self.coverage_source_files
+        regex = self.coverage_exclude_regex
+        files: list[str] = []
+        visited: set[tuple[int, int]] = set()
+        directories = [str(self.project.coverage_source_directory.resolve())]
+        while directories:
+            directory = directories.pop()
+            # Guard: Visit each folder only once as symbolic links may point to a parent folder
+            #        `DirEntry.stat()` does not report the inode number on Windows.
+            info = os.stat(directory)
+            if (info.st_dev, info.st_ino) in visited:
+                continue
+            visited.add((info.st_dev, info.st_ino))
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Skip hidden files and folders
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        # Prune the folder if everything in it is excluded
+                        if regex is None or not regex.search(entry.path + os.sep):
+                            directories.append(entry.path)
+                    elif entry.name.endswith(kCoverageSourceFileExtensions) and entry.is_file():
+                        if regex is None or not regex.search(entry.path):
+                            files.append(entry.path)
+        self.coverage_source_files = sorted(files)
+        return self.coverage_source_files
 
     def get_cmake_generate_flags_for_coverage(self, compiler_flags: list[str]) -> list[str]:
         """
@@ -438,8 +895,13 @@ class ProjectBuilder:
         :param compiler_flags: Special compiler flags needed to analyze the code coverage
         :return: A collection of additional CMake flags for build system generation.
         """
-        flags = " ".join(compiler_flags)
-        return [f"-DCMAKE_C_FLAGS='{flags}'", f"-DCMAKE_CXX_FLAGS='{flags}'"]
+        # Coverage is attributed to each source file, so source files must be compiled on their own
+        cmake_generate_flags = ["-DCMAKE_UNITY_BUILD=OFF"]
+        # Guard: Keep the default compiler flags if no special flags are needed (e.g., MSVC)
+        if compiler_flags:
+            flags = " ".join(compiler_flags)
+            cmake_generate_flags = [f"-DCMAKE_C_FLAGS='{flags}'", f"-DCMAKE_CXX_FLAGS='{flags}'"] + cmake_generate_flags
+        return cmake_generate_flags
 
     def rebuild_and_run_all_tests_with_coverage_gcc(self) -> None:
         """
@@ -448,8 +910,10 @@ class ProjectBuilder:
         gcov = self.get_gcov_path(kCurrentToolchainFile)
         working_directory = self.project.build_directory
         cmake_generate_flags = self.get_cmake_generate_flags_for_coverage(["-fprofile-arcs", "-ftest-coverage"])
-        self.rebuild_project(BuildType.kDebug, cmake_generate_flags=cmake_generate_flags)
-        self.run_all_tests(BuildType.kDebug)
+        # Use a fresh build folder so that profile data left by previous runs is not merged into the report
+        self.rebuild_project(BuildType.kDebug, cmake_generate_flags=cmake_generate_flags, fresh=True)
+        # Tests that share object files would update the same `.gcda` files at the same time
+        self.run_all_tests(BuildType.kDebug, parallel=False)
         # Generate the code coverage report
         # https://stackoverflow.com/questions/55058715/how-to-get-correct-code-coverage-for-member-functions-in-header-files
         subprocess.run(["lcov", "--gcov-tool", gcov, "--capture", "--no-external",
@@ -460,6 +924,34 @@ class ProjectBuilder:
         subprocess.run(["genhtml", "Coverage.info", "--output-directory", "CoverageReport"],
                        cwd=working_directory).check_returncode()
 
+    def generate_coverage_report_clang(self,
+                                       test: str,
+                                       profiles: list[str],
+                                       llvm_profdata: Path,
+                                       llvm_cov: Path,
+                                       sources: list[str]) -> None:
+        """
+        [Helper] Generate the code coverage report of a single test from its raw profile data using `llvm-cov`
+        :param test: The name of the test
+        :param profiles: Paths to the raw profile data files produced by the test
+        :param llvm_profdata: Path to `llvm-profdata`
+        :param llvm_cov: Path to `llvm-cov`
+        :param sources: Arguments that specify the source files to be analyzed for code coverage
+        """
+        working_directory = self.project.build_directory
+        binary = self.get_binary_directory(BuildType.kDebug) / test
+        # Merge all raw profile data into a single file
+        subprocess.run([llvm_profdata, "merge", "-sparse", f"-output={test}.profdata"] + profiles,
+                       cwd=working_directory).check_returncode()
+        # Export the code coverage report as a LCOV file, from which `genhtml` renders the HTML report
+        with open(working_directory / f"{test}CoverageReport.lcov", "w") as fd:
+            subprocess.run([llvm_cov, "export", binary, f"-instr-profile={test}.profdata",
+                            "-Xdemangler", "c++filt", "-Xdemangler", "-n",
+                            "-show-branch-summary", "-format=lcov"] + sources,
+                           cwd=working_directory, stdout=fd).check_returncode()
+        subprocess.run(["genhtml", f"{test}CoverageReport.lcov", "--output-directory", f"{test}CoverageReport"],
+                       cwd=working_directory).check_returncode()
+
     def rebuild_and_run_all_tests_with_coverage_clang(self) -> None:
         """
         Rebuild the project using Clang and run all tests to analyze code coverage using `llvm-cov`
@@ -467,52 +959,76 @@ class ProjectBuilder:
         llvm_profdata = self.get_llvm_profdata_path(kCurrentToolchainFile)
         llvm_cov = self.get_llvm_cov_path(kCurrentToolchainFile)
         sources = self.get_source_files_for_coverage()
-        working_directory = self.project.build_directory
         cmake_generate_flags = self.get_cmake_generate_flags_for_coverage(["-fprofile-instr-generate",
                                                                            "-fcoverage-mapping"])
-        self.rebuild_project(BuildType.kDebug, cmake_generate_flags=cmake_generate_flags)
+        # Use a fresh build folder so that profile data left by previous runs is not merged into the report
+        self.rebuild_project(BuildType.kDebug, cmake_generate_flags=cmake_generate_flags, fresh=True)
         print("Source files for coverage analysis:")
         for source in sources:
             print(f"- {source}")
-        for test in self.project.test_executables:
-            # Run the test and store the raw profile data to the given file
-            self.run_test(test, BuildType.kDebug, env={"LLVM_PROFILE_FILE": f"{test}-%p.profraw"})
-            # Merge all raw profile data into a single file
-            subprocess.run([llvm_profdata, "merge", f"-output={test}.profdata"] +
-                           glob.glob(str(working_directory / f"{test}-*.profraw")),
-                           cwd=working_directory).check_returncode()
-            # Generate the code coverage report as an HTML file
-            with open(working_directory / f"{test}CoverageReport.html", "w") as fd:
-                subprocess.run([llvm_cov, "show", test, f"-instr-profile={test}.profdata",
-                                "-Xdemangler", "c++filt", "-Xdemangler", "-n",
-                                "-show-branches=percent", "-use-color", "--format", "html"] + sources,
-                               cwd=working_directory, stdout=fd).check_returncode()
-            # Export the code coverage report as a LCOV file
-            with open(working_directory / f"{test}CoverageReport.lcov", "w") as fd:
-                subprocess.run([llvm_cov, "export", test, f"-instr-profile={test}.profdata",
-                                "-Xdemangler", "c++filt", "-Xdemangler", "-n",
-                                "-show-branch-summary", "-format=lcov"] + sources,
-                               cwd=working_directory, stdout=fd).check_returncode()
-            subprocess.run(["genhtml", f"{test}CoverageReport.lcov", "--output-directory", f"{test}CoverageReport"],
-                           cwd=working_directory).check_returncode()
+        sys.stdout.flush()
+        # Pass the source files via a response file, so that `llvm-cov` is not limited by the maximum command length
+        response_file = self.project.build_directory / "CoverageSources.rsp"
+        response_file.write_text("".join(['"{}"\n'.format(Path(source).as_posix().replace('"', '\\"'))
+                                          for source in sources]))
+        source_args = [f"@{response_file}"]
+        # Tests and their reports are independent of each other, so process them in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(lambda test: self.analyze_coverage_clang(test, llvm_profdata, llvm_cov, source_args),
+                              self.project.test_executables))
+
+    def analyze_coverage_clang(self, test: str, llvm_profdata: Path, llvm_cov: Path, sources: list[str]) -> None:
+        """
+        [Helper] Run a single test and generate its code coverage report using `llvm-cov`
+        :param test: The name of the test
+        :param llvm_profdata: Path to `llvm-profdata`
+        :param llvm_cov: Path to `llvm-cov`
+        :param sources: Arguments that specify the source files to be analyzed for code coverage
+        """
+        # Each test stores its raw profile data in its own folder, so that tests can run at the same time
+        profile_directory = self.project.build_directory / "Profiles" / test
+        log = self.project.build_directory / f"{test}.log"
+        try:
+            self.run_test(test, BuildType.kDebug, env={"LLVM_PROFILE_FILE": str(profile_directory / "%p.profraw")},
+                          log=log)
+        finally:
+            print(f"Output of test '{test}':\n{log.read_text(errors='replace')}", flush=True)
+        profiles = [str(profile_directory / entry) for entry in os.listdir(profile_directory)]
+        self.generate_coverage_report_clang(test, profiles, llvm_profdata, llvm_cov, sources)
 
     def rebuild_and_run_all_tests_with_coverage_appleclang(self) -> None:
         raise NotImplementedError("Coverage with Apple Clang will be available soon.")
 
     def rebuild_and_run_all_tests_with_coverage_msvc(self) -> None:
         """
-        Rebuild the project using GCC and run all tests to analyze code coverage using `OpenCppCoverage`
+        Rebuild the project using MSVC and run all tests to analyze code coverage using `OpenCppCoverage`
         """
-        # TODO: Need to specify the path to the debug build
-        working_directory = self.project.build_directory / BuildType.kDebug.value
-        self.rebuild_project(BuildType.kDebug)
-        for test in self.project.test_executables:
-            # https://github.com/OpenCppCoverage/OpenCppCoverage/wiki/FAQ#coverage-and-throw
-            subprocess.run(["OpenCppCoverage", "--sources", self.project.coverage_source_directory,
-                            "--excluded_line_regex", '\\s*\\}.*'] +
-                           self.get_exclude_patterns_as_args("--excluded_sources") +
-                           ["--", test],
-                           cwd=working_directory).check_returncode()
+        # `OpenCppCoverage` instruments the tests at runtime, so no special compiler flags are needed
+        cmake_generate_flags = self.get_cmake_generate_flags_for_coverage([])
+        self.rebuild_project(BuildType.kDebug, cmake_generate_flags=cmake_generate_flags, fresh=True)
+        # Tests and their reports are independent of each other, so process them in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(self.analyze_coverage_msvc, self.project.test_executables))
+
+    def analyze_coverage_msvc(self, test: str) -> None:
+        """
+        [Helper] Run a single test and generate its code coverage report using `OpenCppCoverage`
+        :param test: The name of the test
+        """
+        # Each test exports its report to its own folder, so that tests can run at the same time
+        # https://github.com/OpenCppCoverage/OpenCppCoverage/wiki/FAQ#coverage-and-throw
+        working_directory = self.get_binary_directory(BuildType.kDebug)
+        log = self.project.build_directory / f"{test}.log"
+        try:
+            with open(log, "w") as file:
+                subprocess.run(["OpenCppCoverage", "--sources", self.project.coverage_source_directory,
+                                "--excluded_line_regex", '\\s*\\}.*',
+                                "--export_type", f"html:{test}CoverageReport"] +
+                               self.get_exclude_patterns_as_args("--excluded_sources") +
+                               ["--", test],
+                               cwd=working_directory, stdout=file, stderr=subprocess.STDOUT).check_returncode()
+        finally:
+            print(f"Output of test '{test}':\n{log.read_text(errors='replace')}", flush=True)
 
     def rebuild_and_run_all_tests_with_coverage(self) -> None:
         """
@@ -521,6 +1037,8 @@ class ProjectBuilder:
         # Guard: The source folder must not be none
         if self.project.coverage_source_directory is None:
             raise ValueError("The source folder must be specified to analyze the code coverage.")
+        # Pick up source files added or removed since the last run
+        self.coverage_source_files = None
         # Identify the compiler toolchain selected by the user
         compiler = Toolchain(Path(kCurrentToolchainFile).resolve().name).identifier.compiler.type
         if compiler == CompilerType.kGCC:
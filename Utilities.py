@@ -1,11 +1,58 @@
 #
 # MARK: - Utilities
 #
+import contextlib
+import hashlib
+import json
 import shutil
+import stat
 import subprocess
 import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
+
+
+# The folder in which results of slow queries are cached across runs
+kCacheDirectory = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "chaos"
+
+# The number of seconds for which a `brew update` is considered fresh
+kBrewUpdateInterval = 3600
+
+
+def load_cache(name: str) -> dict:
+    """
+    Load the cache of the given name
+    :param name: The name of the cache
+    :return: The cached values, empty if the cache does not exist or cannot be read.
+    """
+    try:
+        with open(kCacheDirectory / f"{name}.json") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_cache(name: str, values: dict) -> None:
+    """
+    Store the given values in the cache of the given name
+    The cache is replaced atomically, so that concurrent runs never read a partially written file.
+    :param name: The name of the cache
+    :param values: The values to be cached
+    """
+    try:
+        os.makedirs(kCacheDirectory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=f".{name}.", dir=kCacheDirectory)
+        with os.fdopen(fd, "w") as file:
+            json.dump(values, file)
+        os.replace(path, kCacheDirectory / f"{name}.json")
+    except OSError:
+        # A cache that cannot be written only costs the time of a repeated query
+        pass
 
 
 def brew_install(packages: list[str]) -> None:
@@ -14,12 +61,57 @@ def brew_install(packages: list[str]) -> None:
     :param packages: Name of the packages
     :raise `CalledProcessError` on error.
     """
-    executable_path = Path(shutil.which("brew"))
-    print(f"Found the Homebrew at {executable_path}.", flush=True)
+    if not hasattr(brew_install, "executable_path"):
+        brew_install.executable_path = Path(shutil.which("brew"))
+        print(f"Found the Homebrew at {brew_install.executable_path}.", flush=True)
+    executable_path = brew_install.executable_path
+    # Guard: Skip packages that have been installed
+    installed = set(subprocess.check_output([executable_path, "list", "--formula", "-1"], text=True).split())
+    packages = [package for package in packages if package not in installed]
+    if not packages:
+        print("All packages have been installed.", flush=True)
+        return
     if not hasattr(brew_install, "updated"):
-        subprocess.run([executable_path, "update"]).check_returncode()
+        # Guard: Skip the update if Homebrew has been updated recently by a previous run
+        if time.time() - load_cache("brew").get("updated", 0) >= kBrewUpdateInterval:
+            subprocess.run([executable_path, "update"]).check_returncode()
+            store_cache("brew", {"updated": time.time()})
         brew_install.updated = True
-    subprocess.run([executable_path, "install"] + packages).check_returncode()
+    # Homebrew has just been updated, so skip its implicit update and the cleanup after each installation
+    env = os.environ.copy()
+    env.setdefault("HOMEBREW_NO_AUTO_UPDATE", "1")
+    env.setdefault("HOMEBREW_NO_INSTALL_CLEANUP", "1")
+    subprocess.run([executable_path, "install"] + packages, env=env).check_returncode()
+
+
+# The number of seconds between two refreshes of the cached `sudo` credentials
+kSudoRefreshInterval = 60
+
+
+@contextlib.contextmanager
+def sudo_keepalive() -> Iterator[None]:
+    """
+    Ask for the `sudo` password once and keep the cached credentials fresh while the context is active
+    This prevents long installations from prompting again once the `sudo` timestamp expires,
+    and the credentials are no longer refreshed as soon as the installation finishes.
+    """
+    stop = threading.Event()
+    thread = None
+    # Guard: Refresh credentials only when the user can be prompted for the password
+    if os.geteuid() != 0 and sys.stdin.isatty() and subprocess.run(["sudo", "-v"]).returncode == 0:
+        def refresh():
+            while not stop.wait(kSudoRefreshInterval):
+                if subprocess.run(["sudo", "-n", "-v"], stderr=subprocess.DEVNULL).returncode != 0:
+                    return
+
+        thread = threading.Thread(target=refresh, name="Refresh sudo credentials", daemon=True)
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        if thread is not None:
+            thread.join()
 
 
 def apt_install(packages: list[str]) -> None:
@@ -28,8 +120,18 @@ def apt_install(packages: list[str]) -> None:
     :param packages: Name of the packages
     :raise `CalledProcessError` on error.
     """
-    subprocess.run(["sudo", "apt", "update", "-y"])
-    subprocess.run(["sudo", "apt", "-y", "install"] + packages).check_returncode()
+    # Guard: Skip packages that have been installed
+    # `dpkg-query` fails if any of the packages is unknown but still reports the status of known ones
+    output = subprocess.run(["dpkg-query", "--show", "--showformat", "${Package} ${db:Status-Abbrev}\\n"] + packages,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    installed = {line.split()[0] for line in output.splitlines() if line.split()[1:2] == ["ii"]}
+    packages = [package for package in packages if package not in installed]
+    if not packages:
+        print("All packages have been installed.", flush=True)
+        return
+    # Refresh the package index and install all packages with a single `sudo` (Failures of the refresh are ignored)
+    with sudo_keepalive():
+        subprocess.run(["sudo", "sh", "-c", 'apt update -y; exec apt -y install "$@"', "sh"] + packages).check_returncode()
 
 
 def apt_add_repository(name: str) -> None:
@@ -38,7 +140,8 @@ def apt_add_repository(name: str) -> None:
     :param name: The repository name
     :raise `CalledProcessError` on error.
     """
-    subprocess.run(["sudo", "add-apt-repository", "-y", name]).check_returncode()
+    with sudo_keepalive():
+        subprocess.run(["sudo", "add-apt-repository", "-y", name]).check_returncode()
 
 
 def pkg_install(packages: list[str]) -> None:
@@ -47,8 +150,9 @@ def pkg_install(packages: list[str]) -> None:
     :param packages: Name of the packages
     :raise `CalledProcessError` on error.
     """
-    subprocess.run(["sudo", "pkg", "update"])
-    subprocess.run(["sudo", "pkg", "install", "-y"] + packages).check_returncode()
+    # Refresh the package catalogue and install all packages with a single `sudo` (Failures of the refresh are ignored)
+    with sudo_keepalive():
+        subprocess.run(["sudo", "sh", "-c", 'pkg update; exec pkg install -y "$@"', "sh"] + packages).check_returncode()
 
 
 def pip_install(packages: list[str]) -> None:
@@ -65,22 +169,55 @@ def winget_install(packages: list[str]) -> None:
     :param packages: Name of the packages
     :raise `CalledProcessError` on error.
     """
-    for package in packages:
-        if subprocess.run(["winget", "list", package], stdout=subprocess.DEVNULL).returncode != 0:
+    # Enumerate installed packages once and keep the result up to date with the installations below
+    if not hasattr(winget_install, "installed"):
+        winget_install.installed = winget_list_installed()
+    installed = winget_install.installed
+    if installed is not None:
+        statuses = [package.lower() in installed for package in packages]
+    else:
+        # Query the installation status of all packages at the same time
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            statuses = list(executor.map(lambda package: subprocess.run(["winget", "list", package],
+                                                                        stdout=subprocess.DEVNULL).returncode == 0,
+                                         packages))
+    # Installations must run one after another as Windows Installer allows only one installation at a time
+    for package, status in zip(packages, statuses):
+        if not status:
             subprocess.run(["winget", "install", package, "--scope", "machine"]).check_returncode()
+            if installed is not None:
+                installed.add(package.lower())
         else:
             # Attempt to upgrade the package
             subprocess.run(["winget", "upgrade", package, "--scope", "machine"])
 
 
+def winget_list_installed() -> set[str] | None:
+    """
+    Enumerate packages installed on the local computer via a single `winget export`
+    :return: Lowercase identifiers of all installed packages that are available in winget sources,
+             `None` if the packages cannot be enumerated.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file = Path(directory) / "packages.json"
+        result = subprocess.run(["winget", "export", "--output", file, "--accept-source-agreements"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            sources = json.loads(file.read_text(encoding="utf-8-sig"))["Sources"]
+        except (OSError, ValueError, KeyError):
+            print(f"Failed to enumerate installed packages via winget (Exit Code: {result.returncode}).", flush=True)
+            return None
+    return {package["PackageIdentifier"].lower() for source in sources for package in source.get("Packages", [])}
+
+
 def choco_install(packages: list[str]) -> None:
     """
     Use Chocolatey to install the given list of packages
     :param packages: Name of the packages
     :raise `CalledProcessError` on error.
     """
-    for package in packages:
-        subprocess.run(["choco", "install", "-y", package]).check_returncode()
+    # Chocolatey installs multiple packages in a single run and holds its own lock while installing
+    subprocess.run(["choco", "install", "-y", "--no-progress"] + packages).check_returncode()
 
 
 def powershell(command: str, cwd: Path = Path.cwd()) -> None:
@@ -98,8 +235,47 @@ def remove_file_if_exist(file: Path) -> None:
     Remove the given file if it exists
     :param file: The name of the file
     """
-    if os.path.lexists(file):
+    try:
         os.remove(file)
+    except FileNotFoundError:
+        pass
+
+
+def remove_files_in_folder(folder: Path, names: set[str]) -> None:
+    """
+    Remove files that have one of the given names from the given folder if they exist
+    :param folder: The folder to be scanned once for the files
+    :param names: The name of the files
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # Symbolic links are removed as well even if they are dangling
+            if entry.name in names and not entry.is_dir(follow_symlinks=False):
+                os.remove(entry.path)
+
+
+def remove_tree(folder: Path) -> None:
+    """
+    Remove the given folder and all its contents, including read-only files
+    Entries that no longer exist, including the folder itself, are ignored.
+    :param folder: The name of the folder
+    """
+    def make_writable_and_retry(function, path, exception: BaseException):
+        # Guard: The entry has been removed already
+        if isinstance(exception, FileNotFoundError):
+            return
+        # Guard: Only read-only files (e.g., Git objects and Conan packages) can be fixed, which Windows refuses to delete
+        if not isinstance(exception, PermissionError):
+            raise exception
+        os.chmod(path, stat.S_IWRITE)
+        function(path)
+
+    # `onerror` is deprecated since Python 3.12 in favor of `onexc`, which receives the exception instead of `excinfo`
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(folder, onexc=make_writable_and_retry)
+    else:
+        shutil.rmtree(folder, onerror=lambda function, path, excinfo:
+                      make_writable_and_retry(function, path, excinfo[1]))
 
 
 def remove_folder_if_exists(folder: Path) -> None:
@@ -107,8 +283,54 @@ def remove_folder_if_exists(folder: Path) -> None:
     Remove the given folder if it exists
     :param folder: The name of the folder
     """
+    remove_tree(folder)
+
+
+def find_trash_folders(folder: Path) -> list[Path]:
+    """
+    Find trash folders left by previous removals of the given folder
+    A removal leaves its trash folder behind if the process is interrupted before the background thread finishes.
+    :param folder: The name of the folder
+    :return: Paths to the trash folders next to the given folder.
+    """
+    folder = Path(folder)
+    prefix = f".{folder.name}.trash."
+    with os.scandir(folder.parent) as entries:
+        return [Path(entry.path) for entry in entries
+                if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False)]
+
+
+def remove_trash_folders(folder: Path) -> None:
+    """
+    Remove trash folders left by previous removals of the given folder
+    :param folder: The name of the folder
+    """
+    for trash in find_trash_folders(folder):
+        remove_tree(trash)
+
+
+def remove_folder_in_background(folder: Path) -> None:
+    """
+    Remove the given folder if it exists without waiting for its contents to be deleted
+    The folder is moved out of the way immediately and then deleted by a background thread,
+    which the interpreter waits for before it exits. Trash folders left by interrupted removals are deleted as well.
+    :param folder: The name of the folder
+    """
+    folder = Path(folder)
+    trashes = find_trash_folders(folder)
     if os.path.lexists(folder):
-        shutil.rmtree(folder)
+        trash = Path(tempfile.mkdtemp(prefix=f".{folder.name}.trash.", dir=folder.parent))
+        try:
+            os.rename(folder, trash / folder.name)
+            trashes.append(trash)
+        except OSError:
+            # The folder cannot be moved (e.g., a file in it is still open on Windows)
+            remove_tree(trash)
+            remove_tree(folder)
+    # Guard: Nothing to be deleted in the background
+    if not trashes:
+        return
+    threading.Thread(target=lambda: [remove_tree(trash) for trash in trashes], name=f"Remove {folder}").start()
 
 
 def is_conan_v2_installed() -> bool:
@@ -117,5 +339,56 @@ def is_conan_v2_installed() -> bool:
     :return: `true` if Conan 2.x has been installed, `false` otherwise.
     """
     if not hasattr(is_conan_v2_installed, "result"):
-        is_conan_v2_installed.result = subprocess.check_output(["conan", "--version"], text=True).startswith("Conan version 2")
+        # Reuse the result of a previous run unless Conan has been reinstalled or upgraded since then
+        path = shutil.which("conan")
+        key = [str(Path(path).resolve()), os.stat(path).st_mtime_ns] if path is not None else None
+        cache = load_cache("conan")
+        if key is not None and cache.get("key") == key:
+            is_conan_v2_installed.result = cache["is_v2"]
+        else:
+            is_conan_v2_installed.result = subprocess.check_output(["conan", "--version"], text=True).startswith("Conan version 2")
+            if key is not None:
+                store_cache("conan", {"key": key, "is_v2": is_conan_v2_installed.result})
     return is_conan_v2_installed.result
+
+
+def compute_digest(files: list[Path], values: list[str] = None) -> str:
+    """
+    Compute the digest of the contents of the given files and the given values
+    :param files: Paths to the files to be hashed (A missing file is treated as an empty one)
+    :param values: Additional values to be hashed
+    :return: The digest as a hexadecimal string.
+    """
+    digest = hashlib.blake2b()
+    for file in files:
+        digest.update(str(file).encode())
+        try:
+            digest.update(Path(file).read_bytes())
+        except FileNotFoundError:
+            pass
+        digest.update(b"\0")
+    for value in values or []:
+        digest.update(str(value).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def read_stamp(file: Path) -> str | None:
+    """
+    Read the digest stored in the given stamp file
+    :param file: Path to the stamp file
+    :return: The stored digest, `None` if the stamp file does not exist.
+    """
+    try:
+        return Path(file).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def write_stamp(file: Path, digest: str) -> None:
+    """
+    Store the given digest in the given stamp file
+    :param file: Path to the stamp file
+    :param digest: The digest to be stored
+    """
+    Path(file).write_text(digest)
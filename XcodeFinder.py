@@ -1,9 +1,13 @@
+from __future__ import annotations
+import functools
 import os
 import re
 import plistlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from operator import attrgetter
+from typing import Iterator
 
 
 kCFBundleIdentifier = "CFBundleIdentifier"
@@ -11,6 +15,8 @@ kCFBundleShortVersionString = "CFBundleShortVersionString"
 
 
 class XcodeBundle:
+    __slots__ = ("url", "major", "minor", "patch", "cached_version")
+
     def __init__(self, url: Path):
         """
         Attempt to parse an Xcode bundle at the given path
@@ -18,17 +24,18 @@ class XcodeBundle:
         :raise `KeyError` if one of the required `CFBundle` properties is missing in `Info.plist`.
                `ValueError` if the required `CFBundle` properties do not match the one of `Xcode`.
         """
-        with open(url / "Contents" / "Info.plist", "rb") as info:
-            plist = plistlib.load(info)
-            if plist[kCFBundleIdentifier] != "com.apple.dt.Xcode":
-                raise ValueError("Mismatched bundle identifier.")
-            tokens: list[str] = plist[kCFBundleShortVersionString].split(".")
-            if len(tokens) != 2 and len(tokens) != 3:
-                raise ValueError("Invalid bundle version.")
-            self.url = url
-            self.major = int(tokens[0])
-            self.minor = int(tokens[1])
-            self.patch = int(tokens[2]) if len(tokens) == 3 else 0
+        # Read the property list with a single read call; `plistlib` detects binary and XML formats by itself
+        plist = plistlib.loads((url / "Contents" / "Info.plist").read_bytes())
+        if plist[kCFBundleIdentifier] != "com.apple.dt.Xcode":
+            raise ValueError("Mismatched bundle identifier.")
+        tokens: list[str] = plist[kCFBundleShortVersionString].split(".")
+        if len(tokens) != 2 and len(tokens) != 3:
+            raise ValueError("Invalid bundle version.")
+        self.url = url
+        self.major = int(tokens[0])
+        self.minor = int(tokens[1])
+        self.patch = int(tokens[2]) if len(tokens) == 3 else 0
+        self.cached_version: str | None = None
 
     @property
     def version(self) -> str:
@@ -36,7 +43,10 @@ class XcodeBundle:
         Get the bundle version
         :return: The version string.
         """
-        return "{}.{}.{}".format(self.major, self.minor, self.patch)
+        # `cached_property` cannot be used with `__slots__`
+        if self.cached_version is None:
+            self.cached_version = f"{self.major}.{self.minor}.{self.patch}"
+        return self.cached_version
 
     @property
     def developer_directory(self) -> Path:
@@ -53,6 +63,14 @@ class XcodeBundle:
         """
         subprocess.run(["sudo", "xcode-select", "--switch", self.developer_directory]).check_returncode()
 
+    def __lt__(self, other: XcodeBundle) -> bool:
+        """
+        Check whether this Xcode installation is older than the given one
+        :param other: Another Xcode installation
+        :return: `True` if this installation has a lower version, `False` otherwise.
+        """
+        return (self.major, self.minor, self.patch) < (other.major, other.minor, other.patch)
+
     def __str__(self) -> str:
         """
         Get the string representation of this Xcode installation
@@ -61,6 +79,33 @@ class XcodeBundle:
         return "{}\n\tVersion: {}".format(self.url, self.version)
 
 
+@functools.lru_cache
+def load_xcode_bundles(directory: Path, pattern: re.Pattern, mtime: int) -> tuple[XcodeBundle, ...]:
+    """
+    Load all Xcode bundles in the given directory
+    :param directory: A path to a directory in which to search for Xcode installations
+    :param pattern: A regular expression to filter out non-Xcode bundles
+    :param mtime: The modification time of the directory, which invalidates the cached result once bundles are
+                  added, removed or renamed
+    :return: All Xcode bundles found in the directory.
+    """
+    def parse(url: Path) -> XcodeBundle | None:
+        try:
+            return XcodeBundle(url)
+        except (KeyError, ValueError, OSError):
+            # Skip bundles that are not Xcode or whose `Info.plist` cannot be read
+            return None
+
+    # Patterns anchored at both ends must match the whole name, which `fullmatch` checks without scanning for a start
+    matches = pattern.fullmatch if pattern.pattern.startswith("^") and pattern.pattern.endswith("$") else pattern.search
+    # Bundles are folders; the file type reported by the directory listing avoids a `stat` call for most entries
+    with os.scandir(directory) as entries:
+        candidates = [Path(entry.path) for entry in entries if matches(entry.name) and entry.is_dir()]
+    # Read property lists of all candidates at the same time, which helps on slow and network volumes
+    with ThreadPoolExecutor(max_workers=min(8, len(candidates) or 1)) as executor:
+        return tuple(bundle for bundle in executor.map(parse, candidates) if bundle is not None)
+
+
 class XcodeFinder:
     def __init__(self, directories: list[Path], pattern: str):
         """
@@ -71,28 +116,31 @@ class XcodeFinder:
         self.directories = directories
         self.pattern = re.compile(pattern)
 
-    def find_all_in_directory(self, directory: Path) -> list[XcodeBundle]:
+    def find_all_in_directory(self, directory: Path) -> Iterator[XcodeBundle]:
         """
         Find all Xcode bundles in the given directory
         :param directory: A path to a directory in which to search for Xcode installations
-        :return: A list of found Xcode bundles
-        """
-        bundles = list[XcodeBundle]()
-        names: list[str] = os.listdir(directory)
-        for name in names:
-            if self.pattern.search(name):
-                try:
-                    bundles.append(XcodeBundle(directory / name))
-                except (KeyError, ValueError):
-                    continue
-        return bundles
+        :return: An iterator over found Xcode bundles
+        """
+        # The directory is scanned eagerly, so that `find_all` scans directories in its worker threads
+        return iter(load_xcode_bundles(directory, self.pattern, os.stat(directory).st_mtime_ns))
 
     def find_all(self) -> list[XcodeBundle]:
         """
         Find all Xcode bundles in each previously specified directory
         :return: A list of found Xcode bundles.
         """
-        return [bundle for directory in self.directories for bundle in self.find_all_in_directory(directory)]
+        # Scan all directories at the same time
+        with ThreadPoolExecutor(max_workers=min(8, len(self.directories) or 1)) as executor:
+            return list(chain.from_iterable(executor.map(self.find_all_in_directory, self.directories)))
+
+    def iterate_all(self) -> Iterator[XcodeBundle]:
+        """
+        Find Xcode bundles lazily, one directory after another
+        :return: An iterator over found Xcode bundles, which scans a directory only when its bundles are needed.
+        """
+        for directory in self.directories:
+            yield from self.find_all_in_directory(directory)
 
     def find(self, major: int, minor: int = None, patch: int = None) -> XcodeBundle:
         """
@@ -102,13 +150,13 @@ class XcodeFinder:
         :param patch: An optional patch version (Pass `None` to find the latest patch release)
         :return: The Xcode bundle of the given version on success, `None` otherwise.
         """
+        # Guard: Stop at the first match if the version is fully specified
+        if minor is not None and patch is not None:
+            return next((bundle for bundle in self.iterate_all()
+                         if (bundle.major, bundle.minor, bundle.patch) == (major, minor, patch)), None)
+        # Otherwise the latest release may be found in any of the directories
         bundles = [bundle for bundle in self.find_all() if bundle.major == major]
-        if minor is None:
-            bundles = sorted(bundles, key=attrgetter("minor"), reverse=True)
-        else:
+        if minor is not None:
             bundles = [bundle for bundle in bundles if bundle.minor == minor]
-            if patch is None:
-                bundles = sorted(bundles, key=attrgetter("patch"), reverse=True)
-            else:
-                bundles = [bundle for bundle in bundles if bundle.patch == patch]
-        return bundles[0] if len(bundles) != 0 else None
+        # Bundles are ordered by their versions
+        return max(bundles, default=None)